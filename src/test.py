@@ -1,55 +1,51 @@
-import json
-import os
-import subprocess
-import sys
-
-env = os.environ.copy()
-p = subprocess.Popen(
-    ["target/debug/litterbox", "stdio"],
-    stdin=subprocess.PIPE,
-    stdout=subprocess.PIPE,
-    text=True,
-    env=env,
-)
-
+#!/usr/bin/env python3
+"""Smoke driver for `litterbox stdio`.
 
-def send(obj):
-    p.stdin.write(json.dumps(obj) + "\n")
-    p.stdin.flush()
+Thin entry point over the shared MCP test harness in
+adrs/2026-02-03-mcp-server-sdk/poc_implementations/test_mcp_server.py,
+so there is one copy of the protocol plumbing to maintain.
 
+Run from the repo root after `cargo build`:
 
-def recv():
-    line = p.stdout.readline()
-    if not line:
-        sys.exit("server closed stdout")
-    print(line.strip())
-    return line
+    python3 src/test.py
+"""
 
+import asyncio
+import importlib.util
+import os
 
-send(
-    {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "clientInfo": {"name": "cli", "version": "0.0.0"},
-            "capabilities": {},
-        },
-    }
-)
-recv()
-
-send({"jsonrpc": "2.0", "method": "notifications/initialized"})
-send({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
-recv()
-
-send(
-    {
-        "jsonrpc": "2.0",
-        "id": 3,
-        "method": "tools/call",
-        "params": {"name": "sandbox-create", "arguments": {"name": "woo"}},
-    }
+_HARNESS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "adrs",
+    "2026-02-03-mcp-server-sdk",
+    "poc_implementations",
+    "test_mcp_server.py",
 )
-recv()
+
+_spec = importlib.util.spec_from_file_location("test_mcp_server", _HARNESS)
+_harness = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_harness)
+
+
+async def main():
+    session = await _harness.McpSession(
+        [os.path.abspath("target/debug/litterbox"), "stdio"]
+    ).start()
+    async with session:
+        print(await session.initialize())
+        print(await session.list_tools())
+        print(
+            await session.request(
+                {
+                    "jsonrpc": "2.0",
+                    "id": 3,
+                    "method": "tools/call",
+                    "params": {"name": "sandbox-create", "arguments": {"name": "woo"}},
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())